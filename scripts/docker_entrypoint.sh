@@ -17,9 +17,15 @@ HOST="${UVICORN_HOST:-0.0.0.0}"
 PORT="${UVICORN_PORT:-5000}"
 WORKERS="${UVICORN_WORKERS:-4}"
 LOG_LEVEL="${UVICORN_LOG_LEVEL:-info}"
+# uvloop/httptools ship with fastapi[all] (uvicorn[standard]); pin them so a missing
+# wheel fails loudly instead of silently falling back to asyncio/h11.
+LOOP="${UVICORN_LOOP:-uvloop}"
+HTTP="${UVICORN_HTTP:-httptools}"
 
 exec uvicorn src.main:app \
   --host "$HOST" \
   --port "$PORT" \
   --workers "$WORKERS" \
+  --loop "$LOOP" \
+  --http "$HTTP" \
   --log-level "$LOG_LEVEL"
@@ -14,17 +14,24 @@ This is intentionally lightweight: it is *not* a full observability stack.
 
 from __future__ import annotations
 
+import asyncio
+import atexit
 import os
 import re
+import queue
+import secrets
 import sqlite3
+import threading
 import time
+import traceback
 import json
 import ipaddress
 import urllib.request
 from uuid import uuid4
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Iterable
 
 
 def _utcnow() -> datetime:
@@ -55,13 +62,15 @@ def get_max_rows() -> int:
     return max(1_000, _parse_int(os.environ.get("ANALYTICS_MAX_ROWS"), 200_000))
 
 
-def _connect() -> sqlite3.Connection:
+def _connect(*, check_same_thread: bool = True) -> sqlite3.Connection:
     db_path = get_db_path()
     parent = os.path.dirname(db_path)
     if parent:
         os.makedirs(parent, exist_ok=True)
 
-    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn = sqlite3.connect(
+        db_path, timeout=30, isolation_level=None, check_same_thread=check_same_thread
+    )
     conn.row_factory = sqlite3.Row
     # Wait a bit for locks instead of failing fast (common on multi-worker startup).
     try:
@@ -75,6 +84,73 @@ def _connect() -> sqlite3.Connection:
     return conn
 
 
+class _ReaderPool:
+    """Small LIFO pool of read connections for the dashboard queries.
+
+    Connections are created lazily (PRAGMAs applied once, in `_connect`) and
+    handed between threads, so they are opened with `check_same_thread=False`;
+    only one thread uses a given connection at a time.
+    """
+
+    def __init__(self, size: int = 4) -> None:
+        self._size = size
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._db_path: str | None = None
+
+    def _reset_if_moved(self) -> None:
+        # ANALYTICS_DB_PATH can change at runtime (tests, local tooling).
+        db_path = get_db_path()
+        if db_path == self._db_path:
+            return
+        with self._lock:
+            if db_path == self._db_path:
+                return
+            self.close()
+            self._db_path = db_path
+
+    def acquire(self) -> sqlite3.Connection:
+        self._reset_if_moved()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return _connect(check_same_thread=False)
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+_reader_pool = _ReaderPool()
+
+
+@contextmanager
+def _reader():
+    conn = _reader_pool.acquire()
+    try:
+        yield conn
+    except BaseException:
+        conn.close()
+        raise
+    else:
+        _reader_pool.release(conn)
+
+
 def init_db() -> None:
     # Multiple workers can race on first-time initialization.
     # Retry a few times rather than failing startup.
@@ -188,9 +264,10 @@ _ip_re = re.compile(r"^(\d{1,3}(?:\.\d{1,3}){3})$")
 
 def extract_client_ip(headers: dict[str, str], fallback: str | None = None) -> str | None:
     # Prefer X-Forwarded-For (first IP is the original client).
+    # partition() stops at the first comma instead of splitting a long proxy chain.
     xff = headers.get("x-forwarded-for")
     if xff:
-        first = xff.split(",")[0].strip()
+        first = xff.partition(",")[0].strip()
         if first:
             return first
 
@@ -299,6 +376,17 @@ def _geoip_enabled() -> bool:
     return _truthy_env("ANALYTICS_GEOIP_ENABLED", default=False)
 
 
+# (our key, ipapi.co key)
+_GEO_MAP = (
+    ("country_code", "country_code"),
+    ("country", "country_name"),
+    ("region", "region"),
+    ("city", "city"),
+    ("latitude", "latitude"),
+    ("longitude", "longitude"),
+)
+
+
 def _geoip_lookup_ipapi_co(ip: str) -> dict[str, Any] | None:
     url = f"https://ipapi.co/{ip}/json/"
     req = urllib.request.Request(
@@ -316,14 +404,7 @@ def _geoip_lookup_ipapi_co(ip: str) -> dict[str, Any] | None:
             return None
         if data.get("error"):
             return None
-        return {
-            "country_code": data.get("country_code"),
-            "country": data.get("country_name"),
-            "region": data.get("region"),
-            "city": data.get("city"),
-            "latitude": data.get("latitude"),
-            "longitude": data.get("longitude"),
-        }
+        return {key: data.get(source) for key, source in _GEO_MAP}
     except Exception:
         return None
 
@@ -534,8 +615,152 @@ def _prune(conn: sqlite3.Connection) -> None:
         )
 
 
+def _optimize(conn: sqlite3.Connection) -> None:
+    # Refresh planner statistics after bulk deletes; cheap when nothing changed.
+    try:
+        conn.execute("PRAGMA optimize")
+    except Exception:
+        pass
+
+
+def _optimize_at_exit() -> None:
+    _reader_pool.close()
+    # Don't create a database just to optimize it.
+    if not os.path.exists(get_db_path()):
+        return
+    try:
+        conn = _connect()
+    except Exception:
+        return
+    try:
+        _optimize(conn)
+    finally:
+        conn.close()
+
+
+atexit.register(_optimize_at_exit)
+
+
+_INSERT_REQUEST_SQL = """
+INSERT INTO request_log(
+    ts, request_id, user_id, method, path, status_code, duration_ms,
+    client_ip, country, country_code, region, city, latitude, longitude,
+    user_agent, browser, referer
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+""".strip()
+
+_INSERT_ERROR_SQL = """
+INSERT INTO error_log(
+    ts, request_id, user_id, kind, message, detail,
+    path, method, status_code, client_ip, user_agent
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+""".strip()
+
+
+def _request_row(
+    *,
+    ts: datetime | None = None,
+    request_id: str | None = None,
+    user_id: str | None = None,
+    method: str,
+    path: str,
+    status_code: int,
+    duration_ms: int,
+    client_ip: str | None,
+    country: str | None,
+    user_agent: str | None,
+    referer: str | None,
+) -> tuple[Any, ...]:
+    normalized_ip = _normalize_ip(client_ip)
+
+    # Best-effort: convert a 2-letter country header into a country_code.
+    country_code = None
+    if country and isinstance(country, str):
+        maybe = country.strip().upper()
+        if len(maybe) == 2 and maybe.isalpha():
+            country_code = maybe
+
+    # GeoIP is now async + queued (never block requests on external I/O).
+    # Best-effort: read from DB cache; if missing, enqueue for background lookup.
+    region = None
+    city = None
+    latitude = None
+    longitude = None
+    try:
+        if not _truthy_env("IP_GEO_ENABLED", default=False):
+            raise RuntimeError("ip_geo_disabled")
+
+        from .ip_geo_store import enqueue_ip, get_cached_geo
+
+        geo_row = get_cached_geo(normalized_ip or "") if normalized_ip else None
+        if geo_row:
+            country = (geo_row.country or country) or None
+            country_code = (geo_row.country_code or country_code) or None
+            region = geo_row.region
+            city = geo_row.city
+            latitude = geo_row.latitude
+            longitude = geo_row.longitude
+        else:
+            # Only queue lookups for public/global IPs.
+            if normalized_ip and _is_public_ip(normalized_ip):
+                enqueue_ip(normalized_ip)
+    except Exception:
+        # Never break the request path.
+        pass
+
+    return (
+        _iso(ts or _utcnow()),
+        request_id,
+        user_id,
+        method,
+        path,
+        int(status_code),
+        int(duration_ms),
+        normalized_ip,
+        country,
+        country_code,
+        region,
+        city,
+        latitude,
+        longitude,
+        user_agent,
+        _browser_family(user_agent),
+        referer,
+    )
+
+
+def _error_row(
+    *,
+    ts: datetime | None = None,
+    request_id: str | None = None,
+    user_id: str | None = None,
+    kind: str,
+    message: str,
+    detail: str | None = None,
+    path: str | None = None,
+    method: str | None = None,
+    status_code: int | None = None,
+    client_ip: str | None = None,
+    user_agent: str | None = None,
+) -> tuple[Any, ...]:
+    return (
+        _iso(ts or _utcnow()),
+        request_id,
+        user_id,
+        kind,
+        message,
+        detail,
+        path,
+        method,
+        int(status_code) if status_code is not None else None,
+        client_ip,
+        user_agent,
+    )
+
+
 def record_request(
     *,
+    ts: datetime | None = None,
     request_id: str | None = None,
     user_id: str | None = None,
     method: str,
@@ -548,76 +773,27 @@ def record_request(
     referer: str | None,
 ) -> None:
     try:
-        normalized_ip = _normalize_ip(client_ip)
-
-        # Best-effort: convert a 2-letter country header into a country_code.
-        country_code = None
-        if country and isinstance(country, str):
-            maybe = country.strip().upper()
-            if len(maybe) == 2 and maybe.isalpha():
-                country_code = maybe
-
-        # GeoIP is now async + queued (never block requests on external I/O).
-        # Best-effort: read from DB cache; if missing, enqueue for background lookup.
-        region = None
-        city = None
-        latitude = None
-        longitude = None
-        try:
-            if not _truthy_env("IP_GEO_ENABLED", default=False):
-                raise RuntimeError("ip_geo_disabled")
-
-            from .ip_geo_store import enqueue_ip, get_cached_geo
-
-            geo_row = get_cached_geo(normalized_ip or "") if normalized_ip else None
-            if geo_row:
-                country = (geo_row.country or country) or None
-                country_code = (geo_row.country_code or country_code) or None
-                region = geo_row.region
-                city = geo_row.city
-                latitude = geo_row.latitude
-                longitude = geo_row.longitude
-            else:
-                # Only queue lookups for public/global IPs.
-                if normalized_ip and _is_public_ip(normalized_ip):
-                    enqueue_ip(normalized_ip)
-        except Exception:
-            # Never break the request path.
-            pass
+        row = _request_row(
+            ts=ts,
+            request_id=request_id,
+            user_id=user_id,
+            method=method,
+            path=path,
+            status_code=status_code,
+            duration_ms=duration_ms,
+            client_ip=client_ip,
+            country=country,
+            user_agent=user_agent,
+            referer=referer,
+        )
 
         with _connect() as conn:
             if _should_prune(conn):
                 _prune(conn)
                 _set_last_prune(conn)
+                _optimize(conn)
 
-            conn.execute(
-                """
-                INSERT INTO request_log(
-                    ts, request_id, user_id, method, path, status_code, duration_ms,
-                    client_ip, country, country_code, region, city, latitude, longitude,
-                    user_agent, browser, referer
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """.strip(),
-                (
-                    _iso(_utcnow()),
-                    request_id,
-                    user_id,
-                    method,
-                    path,
-                    int(status_code),
-                    int(duration_ms),
-                    normalized_ip,
-                    country,
-                    country_code,
-                    region,
-                    city,
-                    latitude,
-                    longitude,
-                    user_agent,
-                    _browser_family(user_agent),
-                    referer,
-                ),
-            )
+            conn.execute(_INSERT_REQUEST_SQL, row)
     except Exception:
         # Analytics must never break the app.
         return
@@ -625,6 +801,7 @@ def record_request(
 
 def record_error(
     *,
+    ts: datetime | None = None,
     request_id: str | None = None,
     user_id: str | None = None,
     kind: str,
@@ -637,33 +814,80 @@ def record_error(
     user_agent: str | None = None,
 ) -> None:
     try:
+        row = _error_row(
+            ts=ts,
+            request_id=request_id,
+            user_id=user_id,
+            kind=kind,
+            message=message,
+            detail=detail,
+            path=path,
+            method=method,
+            status_code=status_code,
+            client_ip=client_ip,
+            user_agent=user_agent,
+        )
+
         with _connect() as conn:
             if _should_prune(conn):
                 _prune(conn)
                 _set_last_prune(conn)
+                _optimize(conn)
 
-            conn.execute(
-                """
-                INSERT INTO error_log(
-                    ts, request_id, user_id, kind, message, detail,
-                    path, method, status_code, client_ip, user_agent
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """.strip(),
-                (
-                    _iso(_utcnow()),
-                    request_id,
-                    user_id,
-                    kind,
-                    message,
-                    detail,
-                    path,
-                    method,
-                    int(status_code) if status_code is not None else None,
-                    client_ip,
-                    user_agent,
-                ),
-            )
+            conn.execute(_INSERT_ERROR_SQL, row)
+    except Exception:
+        return
+
+
+def record_batch(
+    *,
+    requests: Iterable[dict[str, Any]] = (),
+    errors: Iterable[dict[str, Any]] = (),
+    conn: sqlite3.Connection | None = None,
+) -> None:
+    """Write many request/error events in a single `BEGIN IMMEDIATE` transaction.
+
+    Each item holds the keyword arguments of `record_request` / `record_error`,
+    including `ts`, the time the event happened; rows without one are stamped
+    at write time.
+    One commit (and one WAL sync) per batch instead of per row. Pass `conn` to
+    reuse a long-lived connection (the background writer does); otherwise one
+    is opened and closed for this batch.
+    """
+
+    try:
+        request_rows = [_request_row(**item) for item in requests]
+        error_rows = [_error_row(**item) for item in errors]
+        if not request_rows and not error_rows:
+            return
+
+        owns_conn = conn is None
+        if owns_conn:
+            conn = _connect()
+        try:
+            if conn.in_transaction:
+                # A previous batch on this connection died mid-commit.
+                conn.execute("ROLLBACK")
+            if _should_prune(conn):
+                _prune(conn)
+                _set_last_prune(conn)
+                _optimize(conn)
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if request_rows:
+                    conn.executemany(_INSERT_REQUEST_SQL, request_rows)
+                if error_rows:
+                    conn.executemany(_INSERT_ERROR_SQL, error_rows)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            if owns_conn:
+                conn.close()
     except Exception:
+        # Analytics must never break the app.
         return
 
 
@@ -685,7 +909,7 @@ def _since_iso(days: int) -> str:
 
 def get_summary(*, days: int = 1, top_n: int = 10) -> AnalyticsSummary:
     since = _since_iso(days)
-    with _connect() as conn:
+    with _reader() as conn:
         total = conn.execute(
             "SELECT COUNT(*) AS c FROM request_log WHERE ts >= ?",
             (since,),
@@ -756,7 +980,7 @@ def get_summary(*, days: int = 1, top_n: int = 10) -> AnalyticsSummary:
 
 
 def get_recent_requests(*, limit: int = 200) -> list[dict[str, Any]]:
-    with _connect() as conn:
+    with _reader() as conn:
         try:
             # Prefer geo data from the persistent cache if available.
             now_iso = _iso(_utcnow())
@@ -844,7 +1068,7 @@ def get_recent_requests(*, limit: int = 200) -> list[dict[str, Any]]:
 
 
 def get_recent_errors(*, limit: int = 200) -> list[dict[str, Any]]:
-    with _connect() as conn:
+    with _reader() as conn:
         rows = conn.execute(
             """
             SELECT ts, request_id, user_id, kind, message, detail, path, method, status_code, client_ip
@@ -940,3 +1164,279 @@ def get_ip_geo_queue_status() -> dict[str, Any]:
             "due_now": 0,
             "leader": None,
         }
+
+
+# Events are queued by the middleware and written off the event loop in batches.
+_EVENT_QUEUE_MAXSIZE = 10_000
+_WRITER_BATCH_MAX = 200
+# After the first event arrives, wait at most this long to fill the batch.
+_WRITER_BATCH_WINDOW_SECONDS = 0.05
+
+# Owned by the running writer; None when no writer is active.
+_event_queue: asyncio.Queue[tuple[str, dict[str, Any]]] | None = None
+_dropped_events = 0
+
+
+def _enqueue(kind: str, fields: dict[str, Any]) -> None:
+    global _dropped_events
+    q = _event_queue
+    if q is None:
+        _dropped_events += 1
+        return
+    # Stamp the event now; the writer may commit it a batch window later.
+    fields.setdefault("ts", _utcnow())
+    try:
+        q.put_nowait((kind, fields))
+    except asyncio.QueueFull:
+        # Never block (or fail) a request because the writer is behind.
+        _dropped_events += 1
+
+
+def enqueue_request(**fields: Any) -> None:
+    """Queue a `record_request` event for the background writer."""
+    _enqueue("request", fields)
+
+
+def enqueue_error(**fields: Any) -> None:
+    """Queue a `record_error` event for the background writer."""
+    _enqueue("error", fields)
+
+
+def get_dropped_event_count() -> int:
+    return _dropped_events
+
+
+async def _write_batch(
+    batch: list[tuple[str, dict[str, Any]]], conn: sqlite3.Connection | None
+) -> None:
+    requests = [fields for kind, fields in batch if kind == "request"]
+    errors = [fields for kind, fields in batch if kind == "error"]
+    await asyncio.to_thread(record_batch, requests=requests, errors=errors, conn=conn)
+
+
+def _open_writer_connection() -> sqlite3.Connection | None:
+    try:
+        # Batches run in worker threads, one at a time, so cross-thread use is safe.
+        return _connect(check_same_thread=False)
+    except Exception:
+        # Fall back to a connection per batch.
+        return None
+
+
+async def run_analytics_writer(*, stop_event: asyncio.Event) -> None:
+    """Drain queued analytics events into SQLite until `stop_event` is set."""
+
+    global _event_queue
+    # A fresh queue per run: asyncio queues bind to the loop that first awaits them.
+    q: asyncio.Queue[tuple[str, dict[str, Any]]] = asyncio.Queue(maxsize=_EVENT_QUEUE_MAXSIZE)
+    _event_queue = q
+    loop = asyncio.get_running_loop()
+    # One connection for the writer's lifetime instead of a connect per batch.
+    conn = await asyncio.to_thread(_open_writer_connection)
+    while not stop_event.is_set():
+        try:
+            first = await asyncio.wait_for(q.get(), timeout=1.0)
+        except TimeoutError:
+            continue
+
+        batch = [first]
+        deadline = loop.time() + _WRITER_BATCH_WINDOW_SECONDS
+        while len(batch) < _WRITER_BATCH_MAX:
+            try:
+                batch.append(q.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(q.get(), timeout=remaining))
+            except TimeoutError:
+                break
+        await _write_batch(batch, conn)
+
+    # Stop accepting events, then flush whatever was queued before shutdown.
+    _event_queue = None
+    batch = []
+    while True:
+        try:
+            batch.append(q.get_nowait())
+        except asyncio.QueueEmpty:
+            break
+    if batch:
+        await _write_batch(batch, conn)
+    if conn is not None:
+        await asyncio.to_thread(conn.close)
+
+
+def analytics_enabled() -> bool:
+    # Opt-in: every logged request is a SQLite write.
+    return _truthy_env("ANALYTICS_ENABLED", default=False)
+
+
+def _user_id_cookie_name() -> str:
+    return (os.environ.get("ANALYTICS_USER_ID_COOKIE") or "").strip() or "schemaforms_uid"
+
+
+def _user_id_cookie_max_age_seconds() -> int:
+    return max(60, _parse_int(os.environ.get("ANALYTICS_USER_ID_COOKIE_MAX_AGE"), 365 * 24 * 60 * 60))
+
+
+def _analytics_methods() -> frozenset[str]:
+    # HEAD/OPTIONS (health probes, CORS preflights) are not logged by default.
+    raw = os.environ.get("ANALYTICS_METHODS") or "GET,POST"
+    return frozenset(m.strip().upper() for m in raw.split(",") if m.strip())
+
+
+def _request_is_https(scope: dict[str, Any], headers: dict[str, str]) -> bool:
+    # Behind a reverse proxy the original scheme arrives in X-Forwarded-Proto.
+    proto = headers.get("x-forwarded-proto", "").partition(",")[0].strip().lower()
+    if proto:
+        return proto == "https"
+    return scope.get("scheme") == "https"
+
+
+def _cookie_value(cookie_header: str | None, name: str) -> str | None:
+    for part in (cookie_header or "").split(";"):
+        key, sep, value = part.partition("=")
+        if sep and key.strip() == name:
+            return value.strip() or None
+    return None
+
+
+# Asset requests are not worth a row each; checked against the raw path bytes.
+_SKIP_PREFIXES = (b"/static/", b"/vendor/")
+_SKIP_EXACT = frozenset({b"/favicon.ico", b"/static"})
+
+# Innermost traceback frames kept for an error row; outer frames are dropped.
+_ERROR_DETAIL_FRAMES = 20
+
+_H_REQUEST_ID = b"x-request-id"
+_H_SET_COOKIE = b"set-cookie"
+
+# Everything the middleware (and extract_client_ip / extract_country) reads.
+_WANTED_HEADERS = frozenset(
+    {
+        b"x-forwarded-for",
+        b"x-real-ip",
+        b"cf-ipcountry",
+        b"x-country",
+        b"x-forwarded-country",
+        b"x-geo-country",
+        b"x-forwarded-proto",
+        b"x-request-id",
+        b"user-agent",
+        b"referer",
+        b"cookie",
+    }
+)
+
+
+def _extract_headers(scope: dict[str, Any]) -> dict[str, str]:
+    # One pass over the raw ASGI headers (already lower-cased), decoding only
+    # the ones we use. First occurrence wins, like Starlette's Headers.get().
+    headers: dict[str, str] = {}
+    for key, value in scope["headers"]:
+        if key in _WANTED_HEADERS:
+            headers.setdefault(key.decode("latin-1"), value.decode("latin-1"))
+    return headers
+
+
+class AnalyticsMiddleware:
+    """Pure ASGI middleware: one `request_log` row per HTTP request.
+
+    Adds an `x-request-id` response header, issues an anonymous user-id cookie
+    on first visit, and exposes both as `request.state.request_id` /
+    `request.state.user_id`. Unhandled exceptions are also written to `error_log`.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+        # Env is read once; the values don't change while the process runs.
+        self._methods = _analytics_methods()
+        self._cookie_name = _user_id_cookie_name()
+        self._cookie_attrs = (
+            f"; Max-Age={_user_id_cookie_max_age_seconds()}; Path=/; SameSite=Lax; HttpOnly"
+        )
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        raw_path = scope.get("raw_path") or scope["path"].encode()
+        if (
+            raw_path.startswith(_SKIP_PREFIXES)
+            or raw_path in _SKIP_EXACT
+            or scope["method"] not in self._methods
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        headers = _extract_headers(scope)
+        # 64 random bits are plenty to correlate a request.
+        request_id = (headers.get("x-request-id") or "").strip()[:128] or secrets.token_hex(8)
+
+        user_id = _cookie_value(headers.get("cookie"), self._cookie_name)
+        set_cookie = None
+        if not user_id:
+            user_id = secrets.token_hex(16)
+            set_cookie = f"{self._cookie_name}={user_id}{self._cookie_attrs}"
+            if _request_is_https(scope, headers):
+                set_cookie += "; Secure"
+
+        state = scope.setdefault("state", {})
+        state["request_id"] = request_id
+        state["user_id"] = user_id
+
+        status_code = 500
+        start = time.perf_counter()
+
+        extra_headers = [(_H_REQUEST_ID, request_id.encode("latin-1"))]
+        if set_cookie:
+            extra_headers.append((_H_SET_COOKIE, set_cookie.encode("latin-1")))
+
+        async def send_wrapper(message: dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = int(message["status"])
+                # New list: Starlette passes its Response.raw_headers list here.
+                message["headers"] = [*message.get("headers", ()), *extra_headers]
+            await send(message)
+
+        client = scope.get("client")
+        client_ip = extract_client_ip(headers, client[0] if client else None)
+        user_agent = headers.get("user-agent")
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as ex:
+            enqueue_error(
+                request_id=request_id,
+                user_id=user_id,
+                kind=type(ex).__name__,
+                message=str(ex) or type(ex).__name__,
+                # Only the innermost frames fit in the stored detail; skip the rest.
+                detail=traceback.format_exc(limit=-_ERROR_DETAIL_FRAMES)[-4000:],
+                path=path,
+                method=scope["method"],
+                # 500 unless the response had already started (e.g. mid-stream).
+                status_code=status_code,
+                client_ip=client_ip,
+                user_agent=user_agent,
+            )
+            raise
+        finally:
+            enqueue_request(
+                request_id=request_id,
+                user_id=user_id,
+                method=scope["method"],
+                path=path,
+                status_code=status_code,
+                duration_ms=int((time.perf_counter() - start) * 1000),
+                client_ip=client_ip,
+                country=extract_country(headers),
+                user_agent=user_agent,
+                referer=headers.get("referer"),
+            )
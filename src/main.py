@@ -21,13 +21,22 @@ Layouts demonstrated:
 - API-first design with JSON schemas and OpenAPI documentation
 """
 
+import asyncio
+import gzip
 import os
 import hmac
+import json
 import secrets
 import sys
-from pathlib import Path
-
-from fastapi import FastAPI, HTTPException, Request
+from collections.abc import Callable, Mapping
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from functools import cache, lru_cache
+from types import MappingProxyType
+from typing import Any
+
+import jinja2
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.responses import HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
@@ -45,7 +54,10 @@ from .models import (  # Simple Form; Medium Form; Complex Form; Pet Forms; Layo
     UserRegistrationForm,
     create_sample_nested_data,
 )
-from .nested_forms_models import create_comprehensive_sample_data
+
+# The full 6-tab stress-test form lives in its own module (see /organization).
+from .nested_forms_models import ComprehensiveTabbedForm, create_comprehensive_sample_data
+from .analytics import AnalyticsMiddleware, analytics_enabled, init_db, run_analytics_writer
 
 from pydantic_schemaforms import (
     __version__ as _psf_version,
@@ -65,6 +77,7 @@ from pydantic_schemaforms.assets.runtime import (
     bootstrap_icons_css_content,
     read_asset_text,
 )
+from pydantic_schemaforms.html_markers import wrap_with_schemaforms_markers
 from pydantic_schemaforms.live_validation import validation_response_headers
 
 
@@ -209,11 +222,32 @@ _openapi_tags = [
     },
 ]
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up the analytics DB and own the background analytics writer task."""
+    stop_event = asyncio.Event()
+    tasks: list[asyncio.Task] = []
+    if analytics_enabled():
+        try:
+            await asyncio.to_thread(init_db)
+        except Exception:
+            pass
+        tasks.append(asyncio.create_task(run_analytics_writer(stop_event=stop_event)))
+
+    yield
+
+    stop_event.set()
+    # Let the writer flush queued events before the process exits.
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
 app = FastAPI(
     title='Pydantic SchemaForms - FastAPI Example',
     description='Comprehensive showcase of pydantic-schemaforms capabilities in async FastAPI',
     version=_psf_version,
     openapi_tags=_openapi_tags,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -223,6 +257,10 @@ app.add_middleware(
     https_only=False,
 )
 
+# Request analytics (opt-in via ANALYTICS_ENABLED; see src/analytics.py).
+if analytics_enabled():
+    app.add_middleware(AnalyticsMiddleware)
+
 LOGIN_CSRF_SESSION_KEY = 'login_csrf_token'
 REGISTER_CSRF_SESSION_KEY = 'register_csrf_token'
 
@@ -257,28 +295,47 @@ def verify_register_csrf_token(request: Request, submitted_token) -> bool:
     return hmac.compare_digest(str(expected_token), str(submitted_token))
 
 
-_base_dir = Path(__file__).resolve().parent
+_base_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Templates are compiled once per process. Set SCHEMAFORMS_TEMPLATES_AUTO_RELOAD=1
+# (`make run` does) to pick up template edits without a restart.
+templates = Jinja2Templates(
+    env=jinja2.Environment(
+        loader=jinja2.FileSystemLoader(os.path.join(_base_dir, 'templates')),
+        autoescape=jinja2.select_autoescape(),
+        auto_reload=os.getenv('SCHEMAFORMS_TEMPLATES_AUTO_RELOAD', '').lower() in {'1', 'true'},
+        bytecode_cache=jinja2.FileSystemBytecodeCache(),
+    )
+)
 
-templates = Jinja2Templates(directory=_base_dir / 'templates')
+
+# Exact-type serializers for the common non-JSON leaves; subclasses fall through
+# to the isinstance checks in json_serial.
+_JSON_SERIAL_DISPATCH: dict[type, Callable[[Any], Any]] = {
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+}
 
 
 # Add custom JSON filter that handles date objects
 def safe_json_filter(obj):
     """Custom JSON filter that handles date/datetime objects."""
-    import json
-    from datetime import date, datetime
 
     def json_serial(o):
         """JSON serializer for objects not serializable by default json code"""
+        serialize = _JSON_SERIAL_DISPATCH.get(type(o))
+        if serialize is not None:
+            return serialize(o)
         if isinstance(o, (datetime, date)):
             return o.isoformat()
         # Handle layout objects (TabbedLayout, VerticalLayout, etc.)
         elif isinstance(o, FormLayoutBase):
             layout_name = o.__class__.__name__
             tab_names = []
-            if hasattr(o, '_get_layouts'):
+            get_layouts = getattr(o, '_get_layouts', None)
+            if get_layouts is not None:
                 try:
-                    tab_names = [name for name, _ in o._get_layouts()]
+                    tab_names = [name for name, _ in get_layouts()]
                 except Exception:
                     tab_names = []
             payload = {
@@ -289,7 +346,7 @@ def safe_json_filter(obj):
                 payload['tabs'] = tab_names
             return payload
         # Handle other common non-serializable objects
-        elif hasattr(o, '__dict__'):
+        elif getattr(o, '__dict__', None) is not None:
             return str(o)
         raise TypeError(f'Object of type {type(o)} is not JSON serializable')
 
@@ -301,70 +358,117 @@ templates.env.filters['safe_json'] = safe_json_filter
 
 
 # Mount /static to serve images (for favicon, etc.)
-app.mount('/static', StaticFiles(directory=_base_dir / 'static'), name='static')
+app.mount('/static', StaticFiles(directory=os.path.join(_base_dir, 'static')), name='static')
+
+
+# Vendored assets are read and compressed once; responses vary on Accept-Encoding.
+_VARY_ACCEPT_ENCODING = MappingProxyType({'Vary': 'Accept-Encoding'})
+
+_VENDOR_ASSETS: dict[str, Callable[[], str]] = {
+    'bootstrap-icons.css': bootstrap_icons_css_content,
+    'htmx.min.js': lambda: read_asset_text('assets/vendor/htmx/htmx.min.js'),
+}
+
+
+@cache
+def vendor_asset_body(name: str, gzipped: bool) -> bytes:
+    """Encode (and optionally gzip) a vendored asset once per process."""
+    body = _VENDOR_ASSETS[name]().encode()
+    return gzip.compress(body, mtime=0) if gzipped else body
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Return whether an ``Accept-Encoding`` header allows a gzip response.
+
+    Honours q-values (``gzip;q=0`` refuses gzip) and the ``*`` wildcard; an
+    explicit ``gzip`` entry wins over ``*``. ``x-gzip`` is not treated as gzip.
+    """
+    wildcard = None
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding == 'gzip':
+            return q > 0
+        if coding == '*':
+            wildcard = q > 0
+    return bool(wildcard)
+
+
+def vendor_asset_response(request: Request, name: str, media_type: str) -> Response:
+    """Serve a vendored asset from memory, gzipped when the client accepts it."""
+    if not accepts_gzip(request.headers.get('accept-encoding', '')):
+        return Response(
+            vendor_asset_body(name, False), media_type=media_type, headers=_VARY_ACCEPT_ENCODING
+        )
+    return Response(
+        vendor_asset_body(name, True),
+        media_type=media_type,
+        headers={**_VARY_ACCEPT_ENCODING, 'Content-Encoding': 'gzip'},
+    )
 
 
 @app.get('/vendor/bootstrap-icons.css', tags=['System'])
-async def vendor_bootstrap_icons_css():
+async def vendor_bootstrap_icons_css(request: Request):
     """Serve the vendored Bootstrap Icons CSS with the woff2 font embedded as a data URI."""
-    css = bootstrap_icons_css_content()
-    return Response(content=css, media_type='text/css')
+    return vendor_asset_response(request, 'bootstrap-icons.css', 'text/css')
 
 
 @app.get('/vendor/htmx.min.js', tags=['System'])
-async def vendor_htmx_js():
+async def vendor_htmx_js(request: Request):
     """Serve the vendored HTMX JavaScript."""
-    js = read_asset_text('assets/vendor/htmx/htmx.min.js')
-    return Response(content=js, media_type='application/javascript')
+    return vendor_asset_response(request, 'htmx.min.js', 'application/javascript')
+
+
+# Styles the library ships renderers for; other ``?style=`` values get a fresh
+# renderer instead of growing the shared-renderer cache.
+_KNOWN_STYLES = frozenset({'bootstrap', 'material', 'none'})
+
+
+@cache
+def _style_renderer(style: str) -> EnhancedFormRenderer:
+    return EnhancedFormRenderer(framework=style)
+
+
+def enhanced_renderer(style: str) -> EnhancedFormRenderer:
+    """Return a shared renderer for a known style; other styles get a fresh one.
+
+    The renderer keeps no per-render state, so one instance per style is safe to
+    reuse across requests.
+    """
+    if style in _KNOWN_STYLES:
+        return _style_renderer(style)
+    return EnhancedFormRenderer(framework=style)
+
+
+def form_page_context(
+    page: Mapping[str, str], request: Request, style: str, form_html: str, errors=None
+) -> dict:
+    """Build the ``form.html`` context from a route's static ``page`` fields."""
+    context = {**page, 'request': request, 'framework_type': style, 'form_html': form_html}
+    if errors is not None:
+        context['errors'] = errors
+    return context
 
 
 def render_self_contained_demo_page(selected_style: str, form_html: str, renderer_name: str) -> str:
-    """Build the self-contained demo page shared by GET/POST handlers."""
-    escaped_form_html = form_html.replace('<', '&lt;').replace('>', '&gt;')
-    return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Self-Contained Form Demo</title>
-</head>
-<body style="max-width: 600px; margin: 50px auto; padding: 20px; font-family: system-ui;">
-    <h1>Self-Contained Form Demo (FastAPI)</h1>
-    <p><strong>This form includes ZERO external dependencies!</strong></p>
-    <p><strong>Selected Style:</strong> <code>{selected_style}</code></p>
-    <p>Everything needed is embedded in the form HTML below:</p>
-
-    <div style="border: 2px solid #dee2e6; border-radius: 8px; padding: 20px; background: #f8f9fa;">
-        {form_html}
-    </div>
-
-    <div style="margin-top: 30px; padding: 20px; background: #e7f3ff; border-radius: 8px;">
-        <h3>What's Included:</h3>
-        <ul>
-            <li>Self-contained form HTML for style <code>{selected_style}</code></li>
-            <li>JavaScript for interactions</li>
-            <li>Form validation and styling</li>
-            <li>No external CDN dependencies</li>
-        </ul>
-        <p><strong>Template Usage:</strong> <code>&lt;div&gt;{{{{ form_html | safe }}}}&lt;/div&gt;</code></p>
-    </div>
-
-    <div style="margin-top: 30px; padding: 20px; background: #f8f9fa; border-radius: 8px; border: 1px solid #dee2e6;">
-        <h3>Raw HTML Source:</h3>
-        <p>This is the complete HTML generated by <code>{renderer_name}</code>:</p>
-        <details style="margin-top: 15px;">
-            <summary style="cursor: pointer; font-weight: bold; padding: 10px; background: #fff; border: 1px solid #ddd; border-radius: 4px;">
-                Click to view raw HTML source
-            </summary>
-            <pre style="background: #f8f9fa; padding: 15px; border: 1px solid #dee2e6; border-radius: 4px; overflow-x: auto; font-size: 12px; margin-top: 10px; white-space: pre-wrap; word-wrap: break-word;"><code>{escaped_form_html}</code></pre>
-        </details>
-    </div>
-
-    <div style="text-align: center; margin-top: 30px;">
-        <a href="/" style="color: #0066cc; text-decoration: none;">← Back to FastAPI Examples</a>
-    </div>
-</body>
-</html>"""
+    """Build the self-contained demo page shared by GET/POST handlers.
+
+    The page lives in ``templates/self_contained.html`` so it is compiled once by
+    the shared Jinja environment, which also escapes the raw-source listing.
+    """
+    return templates.get_template('self_contained.html').render(
+        selected_style=selected_style,
+        form_html=form_html,
+        renderer_name=renderer_name,
+    )
 
 
 # ================================
@@ -393,6 +497,21 @@ async def home(request: Request):
 # ================================
 
 
+# Demo pre-fill payloads (read-only; the renderer copies form data before use).
+_EMPTY_FORM_DATA = MappingProxyType({})
+_LOGIN_DEMO_DATA = MappingProxyType(
+    {'username': 'demo_user', 'password': 'demo_pass', 'remember_me': True}
+)
+
+
+def parse_json_data_param(data: str):
+    """Parse a ``?data=`` pre-fill payload, ignoring invalid JSON."""
+    try:
+        return json.loads(data)
+    except Exception:
+        return _EMPTY_FORM_DATA
+
+
 @app.get('/login', response_class=HTMLResponse, tags=['Simple Forms'])
 async def login_get(
     request: Request,
@@ -406,17 +525,12 @@ async def login_get(
     csrf_token = issue_login_csrf_token(request)
 
     # Parse optional pre-fill data or use demo data
-    form_data = {}
+    form_data = _EMPTY_FORM_DATA
     if data:
-        try:
-            import json
-
-            form_data = json.loads(data)
-        except Exception:
-            pass  # Ignore invalid JSON
+        form_data = parse_json_data_param(data)
     elif demo or not data:
         # Add demo data for easier testing
-        form_data = {'username': 'demo_user', 'password': 'demo_pass', 'remember_me': True}
+        form_data = _LOGIN_DEMO_DATA
 
     form_html = await render_form_html_async(
         MinimalLoginForm,
@@ -454,13 +568,13 @@ async def login_post(
     """Simple form example - Login form submission (async)."""
     # Get form data asynchronously
     form_data = await request.form()
-    form_dict = dict(form_data)
-
-    submitted_csrf_token = form_dict.pop('csrf_token', None)
+    submitted_csrf_token = form_data.get('csrf_token')
+    # Everything except the CSRF token, read straight from the FormData.
+    form_fields = [(key, value) for key, value in form_data.items() if key != 'csrf_token']
     csrf_error = 'CSRF verification failed. Refresh the page and submit again.'
     if not verify_login_csrf_token(request, submitted_csrf_token):
         csrf_token = issue_login_csrf_token(request)
-        parsed_data = parse_nested_form_data(form_dict)
+        parsed_data = parse_nested_form_data(form_fields)
 
         form_html = await render_form_html_async(
             MinimalLoginForm,
@@ -493,7 +607,7 @@ async def login_post(
             status_code=403,
         )
 
-    parsed_data = parse_nested_form_data(form_dict)
+    parsed_data = parse_nested_form_data(form_fields)
     validation = MinimalLoginForm.validate(
         parsed_data,
         submit_url=f'/login?style={style}',
@@ -504,8 +618,8 @@ async def login_post(
         csrf_field_name='csrf_token',
     )
 
-    full_referer_path = create_refer_path(request)
     if validation.is_valid:
+        full_referer_path = create_refer_path(request)
         request.session.pop(LOGIN_CSRF_SESSION_KEY, None)
         return templates.TemplateResponse(
             request,
@@ -549,6 +663,18 @@ async def login_post(
 # ================================
 
 
+_REGISTER_DEMO_DATA = MappingProxyType(
+    {
+        'username': 'alex_johnson',
+        'email': 'alex.johnson@example.com',
+        'password': 'SecurePass123!',
+        'confirm_password': 'SecurePass123!',
+        'age': 28,
+        'role': 'user',
+    }
+)
+
+
 @app.get('/register', response_class=HTMLResponse, tags=['Registration'])
 async def register_get(
     request: Request,
@@ -562,24 +688,12 @@ async def register_get(
     csrf_token = issue_register_csrf_token(request)
 
     # Parse optional pre-fill data or use demo data
-    form_data = {}
+    form_data = _EMPTY_FORM_DATA
     if data:
-        try:
-            import json
-
-            form_data = json.loads(data)
-        except Exception:
-            pass  # Ignore invalid JSON
+        form_data = parse_json_data_param(data)
     elif demo or not data:
         # Add demo data for easier testing
-        form_data = {
-            'username': 'alex_johnson',
-            'email': 'alex.johnson@example.com',
-            'password': 'SecurePass123!',
-            'confirm_password': 'SecurePass123!',
-            'age': 28,
-            'role': 'user',
-        }
+        form_data = _REGISTER_DEMO_DATA
 
     form_html = await render_form_html_async(
         UserRegistrationForm,
@@ -631,13 +745,13 @@ async def register_post(
     """Medium complexity form - User registration submission (async)."""
     # Get form data asynchronously
     form_data = await request.form()
-    form_dict = dict(form_data)
-
-    submitted_csrf_token = form_dict.pop('csrf_token', None)
+    submitted_csrf_token = form_data.get('csrf_token')
+    # Everything except the CSRF token, read straight from the FormData.
+    form_fields = [(key, value) for key, value in form_data.items() if key != 'csrf_token']
     csrf_error = 'CSRF verification failed. Refresh the page and submit again.'
     if not verify_register_csrf_token(request, submitted_csrf_token):
         csrf_token = issue_register_csrf_token(request)
-        parsed_data = parse_nested_form_data(form_dict)
+        parsed_data = parse_nested_form_data(form_fields)
 
         form_html = await render_form_html_async(
             UserRegistrationForm,
@@ -670,7 +784,7 @@ async def register_post(
             status_code=403,
         )
 
-    parsed_data = parse_nested_form_data(form_dict)
+    parsed_data = parse_nested_form_data(form_fields)
     validation = UserRegistrationForm.validate(
         parsed_data,
         submit_url=f'/register?style={style}',
@@ -681,8 +795,8 @@ async def register_post(
         csrf_field_name='csrf_token',
     )
 
-    full_referer_path = create_refer_path(request)
     if validation.is_valid:
+        full_referer_path = create_refer_path(request)
         request.session.pop(REGISTER_CSRF_SESSION_KEY, None)
         return templates.TemplateResponse(
             request,
@@ -725,6 +839,35 @@ async def register_post(
 # ================================
 
 
+_SHOWCASE_DEMO_DATA = MappingProxyType(
+    {
+        'first_name': 'Demo',
+        'last_name': 'Showcase User',
+        'email': 'showcase@example.com',
+        'bio': 'This is a demo biography showcasing the textarea field with rich content. It demonstrates how longer text content appears in the form.',
+        'age': 32,
+        'birth_date': '1991-08-15',
+        'phone': '+1 (555) 123-4567',
+        'country': 'US',
+        'favorite_color': '#3498db',
+        'experience_level': 'advanced',
+        'newsletter_subscription': True,
+        'newsletter': True,
+    }
+)
+
+
+# Static per-route page context; handlers add the request, style and form HTML.
+_SHOWCASE_PAGE_CONTEXT = MappingProxyType(
+    {
+        'title': 'Complete Showcase - Complex Form',
+        'description': 'Demonstrates ALL library features: model lists, sections, all input types',
+        'framework': 'fastapi',
+        'framework_name': 'FastAPI (Async)',
+    }
+)
+
+
 @app.get('/showcase', response_class=HTMLResponse, tags=['Showcase'])
 async def showcase_get(
     request: Request,
@@ -736,30 +879,12 @@ async def showcase_get(
 ):
     """Complex form example - All features and field types (GET)."""
     # Parse optional pre-fill data or use demo data
-    form_data = {}
+    form_data = _EMPTY_FORM_DATA
     if data:
-        try:
-            import json
-
-            form_data = json.loads(data)
-        except Exception:
-            pass  # Ignore invalid JSON
+        form_data = parse_json_data_param(data)
     elif demo:
         # Add comprehensive demo data for all showcase features
-        form_data = {
-            'first_name': 'Demo',
-            'last_name': 'Showcase User',
-            'email': 'showcase@example.com',
-            'bio': 'This is a demo biography showcasing the textarea field with rich content. It demonstrates how longer text content appears in the form.',
-            'age': 32,
-            'birth_date': '1991-08-15',
-            'phone': '+1 (555) 123-4567',
-            'country': 'US',
-            'favorite_color': '#3498db',
-            'experience_level': 'advanced',
-            'newsletter_subscription': True,
-            'newsletter': True,
-        }
+        form_data = _SHOWCASE_DEMO_DATA
 
     form_html = await render_form_html_async(
         CompleteShowcaseForm,
@@ -772,17 +897,7 @@ async def showcase_get(
     )
 
     return templates.TemplateResponse(
-        request,
-        'form.html',
-        {
-            'request': request,
-            'title': 'Complete Showcase - Complex Form',
-            'description': 'Demonstrates ALL library features: model lists, sections, all input types',
-            'framework': 'fastapi',
-            'framework_name': 'FastAPI (Async)',
-            'framework_type': style,
-            'form_html': form_html,
-        },
+        request, 'form.html', form_page_context(_SHOWCASE_PAGE_CONTEXT, request, style, form_html)
     )
 
 
@@ -793,10 +908,11 @@ async def showcase_post(
     """Complex form example - All features submission (async)."""
     # Get form data asynchronously
     form_data = await request.form()
-    form_dict = dict(form_data)
 
-    parsed_data = parse_nested_form_data(form_dict)
-    validation = CompleteShowcaseForm.validate(
+    parsed_data = parse_nested_form_data(form_data.multi_items())
+    # Validating the nested models is CPU-bound; keep it off the event loop.
+    validation = await asyncio.to_thread(
+        CompleteShowcaseForm.validate,
         parsed_data,
         submit_url=f'/showcase?style={style}',
         framework=style,
@@ -805,8 +921,8 @@ async def showcase_post(
         enable_logging=True,
     )
 
-    full_referer_path = create_refer_path(request)
     if validation.is_valid:
+        full_referer_path = create_refer_path(request)
         return templates.TemplateResponse(
             request,
             'success.html',
@@ -825,16 +941,7 @@ async def showcase_post(
         return templates.TemplateResponse(
             request,
             'form.html',
-            {
-                'request': request,
-                'title': 'Complete Showcase - Complex Form',
-                'description': 'Demonstrates ALL library features: model lists, sections, all input types',
-                'framework': 'fastapi',
-                'framework_name': 'FastAPI (Async)',
-                'framework_type': style,
-                'form_html': form_html,
-                'errors': validation.errors,
-            },
+            form_page_context(_SHOWCASE_PAGE_CONTEXT, request, style, form_html, validation.errors),
         )
 
 
@@ -843,6 +950,130 @@ async def showcase_post(
 # ================================
 
 
+_PETS_DEMO_DATA = MappingProxyType(
+    {
+        'owner_name': 'Sarah Thompson',
+        'email': 'sarah.thompson@email.com',
+        'address': '5 Marine Parade, ',
+        'emergency_contact': 'Mike Thompson - (555) 123-4567',
+        'pets': [
+            {
+                'name': 'Tweety',
+                'species': 'bird',
+                'breed': 'Canary',
+                'age': 2,
+                'weight': 0.02,
+                'microchipped': False,
+                'last_vet_visit': '2024-11-01',
+                'special_needs': 'Requires daily singing practice and fresh seed mix',
+            },
+            {
+                'name': 'Buddy',
+                'species': 'dog',
+                'breed': 'Golden Retriever',
+                'age': 3,
+                'weight': 65.5,
+                'microchipped': True,
+                'last_vet_visit': '2024-10-15',
+                'special_needs': 'Needs daily medication for hip dysplasia',
+            },
+            {
+                'name': 'Whiskers',
+                'species': 'cat',
+                'breed': 'Maine Coon',
+                'age': 5,
+                'weight': 12.3,
+                'microchipped': True,
+                'last_vet_visit': '2024-09-20',
+                'special_needs': 'Indoor only, sensitive to loud noises',
+            },
+            {
+                'name': 'Nemo',
+                'species': 'fish',
+                'breed': 'Clownfish',
+                'age': 1,
+                'weight': 0.1,
+                'microchipped': False,
+                'last_vet_visit': '2024-08-12',
+                'special_needs': 'Saltwater aquarium with anemone, pH monitoring',
+            },
+            {
+                'name': 'Bunny',
+                'species': 'rabbit',
+                'breed': 'Holland Lop',
+                'age': 4,
+                'weight': 3.2,
+                'microchipped': True,
+                'last_vet_visit': '2024-09-05',
+                'special_needs': 'High-fiber diet, daily exercise in secure area',
+            },
+            {
+                'name': 'Peanut',
+                'species': 'hamster',
+                'breed': 'Syrian Hamster',
+                'age': 1,
+                'weight': 0.12,
+                'microchipped': False,
+                'last_vet_visit': '2024-07-22',
+                'special_needs': 'Nocturnal, needs quiet during day, wheel for exercise',
+            },
+            {
+                'name': 'Scales',
+                'species': 'reptile',
+                'breed': 'Bearded Dragon',
+                'age': 6,
+                'weight': 0.4,
+                'microchipped': False,
+                'last_vet_visit': '2024-10-30',
+                'special_needs': 'UV lighting, temperature gradient 75-105°F, live insects',
+            },
+            {
+                'name': 'Chester',
+                'species': 'other',
+                'breed': 'Chinchilla',
+                'age': 3,
+                'weight': 0.6,
+                'microchipped': False,
+                'last_vet_visit': '2024-09-18',
+                'special_needs': 'Dust baths only, no water baths, cool temperature',
+            },
+            {
+                'name': 'Coco',
+                'species': 'bird',
+                'breed': 'African Grey Parrot',
+                'age': 12,
+                'weight': 0.45,
+                'microchipped': True,
+                'is_vaccinated': True,
+                'last_vet_visit': '2024-11-10',
+                'special_needs': 'Highly intelligent, requires 4+ hours of interaction daily',
+            },
+            {
+                'name': 'Gizmo',
+                'species': 'other',
+                'breed': 'Ferret',
+                'age': 2,
+                'weight': 0.8,
+                'microchipped': True,
+                'is_vaccinated': True,
+                'last_vet_visit': '2024-10-22',
+                'special_needs': 'Annual distemper and rabies vaccines required; needs ferret-proofed play area',
+            },
+        ],
+    }
+)
+
+
+_PETS_PAGE_CONTEXT = MappingProxyType(
+    {
+        'title': 'Pet Registration - Dynamic Lists',
+        'description': 'Demonstrates pet registration with dynamic lists and owner information',
+        'framework': 'fastapi',
+        'framework_name': 'FastAPI (Async)',
+    }
+)
+
+
 # Alias routes for template compatibility
 @app.get('/pets', response_class=HTMLResponse, tags=['Dynamic Lists'])
 async def pets_get(
@@ -855,126 +1086,12 @@ async def pets_get(
 ):
     """Pet registration form - demonstrates dynamic lists and complex models."""
     # Parse optional pre-fill data or use demo data
-    form_data = {}
+    form_data = _EMPTY_FORM_DATA
     if data:
-        try:
-            import json
-
-            form_data = json.loads(data)
-        except Exception:
-            pass  # Ignore invalid JSON
+        form_data = parse_json_data_param(data)
     elif demo:
         # Add demo data for pet registration
-        form_data = {
-            'owner_name': 'Sarah Thompson',
-            'email': 'sarah.thompson@email.com',
-            'address': '5 Marine Parade, ',
-            'emergency_contact': 'Mike Thompson - (555) 123-4567',
-            'pets': [
-                {
-                    'name': 'Tweety',
-                    'species': 'bird',
-                    'breed': 'Canary',
-                    'age': 2,
-                    'weight': 0.02,
-                    'microchipped': False,
-                    'last_vet_visit': '2024-11-01',
-                    'special_needs': 'Requires daily singing practice and fresh seed mix',
-                },
-                {
-                    'name': 'Buddy',
-                    'species': 'dog',
-                    'breed': 'Golden Retriever',
-                    'age': 3,
-                    'weight': 65.5,
-                    'microchipped': True,
-                    'last_vet_visit': '2024-10-15',
-                    'special_needs': 'Needs daily medication for hip dysplasia',
-                },
-                {
-                    'name': 'Whiskers',
-                    'species': 'cat',
-                    'breed': 'Maine Coon',
-                    'age': 5,
-                    'weight': 12.3,
-                    'microchipped': True,
-                    'last_vet_visit': '2024-09-20',
-                    'special_needs': 'Indoor only, sensitive to loud noises',
-                },
-                {
-                    'name': 'Nemo',
-                    'species': 'fish',
-                    'breed': 'Clownfish',
-                    'age': 1,
-                    'weight': 0.1,
-                    'microchipped': False,
-                    'last_vet_visit': '2024-08-12',
-                    'special_needs': 'Saltwater aquarium with anemone, pH monitoring',
-                },
-                {
-                    'name': 'Bunny',
-                    'species': 'rabbit',
-                    'breed': 'Holland Lop',
-                    'age': 4,
-                    'weight': 3.2,
-                    'microchipped': True,
-                    'last_vet_visit': '2024-09-05',
-                    'special_needs': 'High-fiber diet, daily exercise in secure area',
-                },
-                {
-                    'name': 'Peanut',
-                    'species': 'hamster',
-                    'breed': 'Syrian Hamster',
-                    'age': 1,
-                    'weight': 0.12,
-                    'microchipped': False,
-                    'last_vet_visit': '2024-07-22',
-                    'special_needs': 'Nocturnal, needs quiet during day, wheel for exercise',
-                },
-                {
-                    'name': 'Scales',
-                    'species': 'reptile',
-                    'breed': 'Bearded Dragon',
-                    'age': 6,
-                    'weight': 0.4,
-                    'microchipped': False,
-                    'last_vet_visit': '2024-10-30',
-                    'special_needs': 'UV lighting, temperature gradient 75-105°F, live insects',
-                },
-                {
-                    'name': 'Chester',
-                    'species': 'other',
-                    'breed': 'Chinchilla',
-                    'age': 3,
-                    'weight': 0.6,
-                    'microchipped': False,
-                    'last_vet_visit': '2024-09-18',
-                    'special_needs': 'Dust baths only, no water baths, cool temperature',
-                },
-                {
-                    'name': 'Coco',
-                    'species': 'bird',
-                    'breed': 'African Grey Parrot',
-                    'age': 12,
-                    'weight': 0.45,
-                    'microchipped': True,
-                    'is_vaccinated': True,
-                    'last_vet_visit': '2024-11-10',
-                    'special_needs': 'Highly intelligent, requires 4+ hours of interaction daily',
-                },
-                {
-                    'name': 'Gizmo',
-                    'species': 'other',
-                    'breed': 'Ferret',
-                    'age': 2,
-                    'weight': 0.8,
-                    'microchipped': True,
-                    'is_vaccinated': True,
-                    'last_vet_visit': '2024-10-22',
-                    'special_needs': 'Annual distemper and rabies vaccines required; needs ferret-proofed play area',
-                },
-            ],
-        }
+        form_data = _PETS_DEMO_DATA
 
     form_html = await render_form_html_async(
         PetRegistrationForm,
@@ -987,17 +1104,7 @@ async def pets_get(
     )
 
     return templates.TemplateResponse(
-        request,
-        'form.html',
-        {
-            'request': request,
-            'title': 'Pet Registration - Dynamic Lists',
-            'description': 'Demonstrates pet registration with dynamic lists and owner information',
-            'framework': 'fastapi',
-            'framework_name': 'FastAPI (Async)',
-            'framework_type': style,
-            'form_html': form_html,
-        },
+        request, 'form.html', form_page_context(_PETS_PAGE_CONTEXT, request, style, form_html)
     )
 
 
@@ -1008,10 +1115,10 @@ async def pets_post(
     """Pet registration form submission."""
     # Get form data asynchronously
     form_data = await request.form()
-    form_dict = dict(form_data)
 
-    parsed_data = parse_nested_form_data(form_dict)
-    validation = PetRegistrationForm.validate(
+    parsed_data = parse_nested_form_data(form_data.multi_items())
+    validation = await asyncio.to_thread(
+        PetRegistrationForm.validate,
         parsed_data,
         submit_url=f'/pets?style={style}',
         framework=style,
@@ -1020,8 +1127,8 @@ async def pets_post(
         enable_logging=True,
     )
 
-    full_referer_path = create_refer_path(request)
     if validation.is_valid:
+        full_referer_path = create_refer_path(request)
         return templates.TemplateResponse(
             request,
             'success.html',
@@ -1040,16 +1147,7 @@ async def pets_post(
         return templates.TemplateResponse(
             request,
             'form.html',
-            {
-                'request': request,
-                'title': 'Pet Registration - Dynamic Lists',
-                'description': 'Demonstrates pet registration with dynamic lists and owner information',
-                'framework': 'fastapi',
-                'framework_name': 'FastAPI (Async)',
-                'framework_type': style,
-                'form_html': form_html,
-                'errors': validation.errors,
-            },
+            form_page_context(_PETS_PAGE_CONTEXT, request, style, form_html, validation.errors),
         )
 
 
@@ -1061,6 +1159,18 @@ async def pets_post(
 # ================================
 
 
+# Built once at import; the sample builders return the same payload every call.
+_ORGANIZATION_DEMO_DATA = MappingProxyType(create_comprehensive_sample_data())
+_ORGANIZATION_PAGE_CONTEXT = MappingProxyType(
+    {
+        'title': 'Comprehensive Tabbed Interface - 6 Tabs! 🚀',
+        'description': 'Ultimate showcase: Organization (5 levels deep) + Kitchen Sink (ALL inputs) + Contacts + Scheduling + Media + Settings',
+        'framework': 'fastapi',
+        'framework_name': 'FastAPI (Async)',
+    }
+)
+
+
 @app.get('/organization', response_class=HTMLResponse, tags=['Advanced Nested'])
 async def organization_get(
     request: Request,
@@ -1088,21 +1198,12 @@ async def organization_get(
             `/organization-shared` using models from `shared_models.py`.
     """
     # Parse optional pre-fill data or use demo data
-    form_data = {}
+    form_data = _EMPTY_FORM_DATA
     if data:
-        try:
-            import json
-
-            form_data = json.loads(data)
-        except Exception:
-            pass  # Ignore invalid JSON
+        form_data = parse_json_data_param(data)
     elif demo:
         # Use comprehensive sample data for all tabs
-        form_data = create_comprehensive_sample_data()
-
-    # Import locally to keep this route explicitly tied to the full nested demo.
-    # This makes it clear which module provides the comprehensive tabbed layout.
-    from .nested_forms_models import ComprehensiveTabbedForm
+        form_data = _ORGANIZATION_DEMO_DATA
 
     form_html = await render_form_html_async(
         ComprehensiveTabbedForm,
@@ -1117,15 +1218,7 @@ async def organization_get(
     return templates.TemplateResponse(
         request,
         'form.html',
-        {
-            'request': request,
-            'title': 'Comprehensive Tabbed Interface - 6 Tabs! 🚀',
-            'description': 'Ultimate showcase: Organization (5 levels deep) + Kitchen Sink (ALL inputs) + Contacts + Scheduling + Media + Settings',
-            'framework': 'fastapi',
-            'framework_name': 'FastAPI (Async)',
-            'framework_type': style,
-            'form_html': form_html,
-        },
+        form_page_context(_ORGANIZATION_PAGE_CONTEXT, request, style, form_html),
     )
 
 
@@ -1141,21 +1234,19 @@ async def organization_post(
     """
     # Get form data asynchronously
     form_data = await request.form()
-    form_dict = dict(form_data)
-
-    from .nested_forms_models import ComprehensiveTabbedForm
 
-    parsed_data = parse_nested_form_data(form_dict)
-    validation = ComprehensiveTabbedForm.validate(
+    parsed_data = parse_nested_form_data(form_data.multi_items())
+    validation = await asyncio.to_thread(
+        ComprehensiveTabbedForm.validate,
         parsed_data,
         submit_url=f'/organization?style={style}',
         framework=style,
         debug=debug,
         show_timing=show_timing,
     )
-    full_referer_path = create_refer_path(request)
 
     if validation.is_valid:
+        full_referer_path = create_refer_path(request)
         return templates.TemplateResponse(
             request,
             'success.html',
@@ -1174,19 +1265,23 @@ async def organization_post(
         return templates.TemplateResponse(
             request,
             'form.html',
-            {
-                'request': request,
-                'title': 'Comprehensive Tabbed Interface - 6 Tabs! 🚀',
-                'description': 'Ultimate showcase: Organization (5 levels deep) + Kitchen Sink (ALL inputs) + Contacts + Scheduling + Media + Settings',
-                'framework': 'fastapi',
-                'framework_name': 'FastAPI (Async)',
-                'framework_type': style,
-                'form_html': form_html,
-                'errors': validation.errors,
-            },
+            form_page_context(
+                _ORGANIZATION_PAGE_CONTEXT, request, style, form_html, validation.errors
+            ),
         )
 
 
+_ORGANIZATION_SHARED_DEMO_DATA = MappingProxyType(create_sample_nested_data())
+_ORGANIZATION_SHARED_PAGE_CONTEXT = MappingProxyType(
+    {
+        'title': 'Organization (Shared Models) - 5 Levels Deep 🏢',
+        'description': 'Reusable organization-only example powered by models in shared_models.py.',
+        'framework': 'fastapi',
+        'framework_name': 'FastAPI (Async)',
+    }
+)
+
+
 @app.get('/organization-shared', response_class=HTMLResponse, tags=['Advanced Nested'])
 async def organization_shared_get(
     request: Request,
@@ -1202,17 +1297,12 @@ async def organization_shared_get(
     This route is the reusable counterpart to `/organization` and shows how to
     render a deeply nested form directly from models in `shared_models.py`.
     """
-    form_data = {}
+    form_data = _EMPTY_FORM_DATA
     if data:
-        try:
-            import json
-
-            form_data = json.loads(data)
-        except Exception:
-            pass
+        form_data = parse_json_data_param(data)
     elif demo:
         # Seed with realistic nested data so users can inspect structure quickly.
-        form_data = create_sample_nested_data()
+        form_data = _ORGANIZATION_SHARED_DEMO_DATA
 
     form_html = await render_form_html_async(
         CompanyOrganizationForm,
@@ -1227,15 +1317,7 @@ async def organization_shared_get(
     return templates.TemplateResponse(
         request,
         'form.html',
-        {
-            'request': request,
-            'title': 'Organization (Shared Models) - 5 Levels Deep 🏢',
-            'description': 'Reusable organization-only example powered by models in shared_models.py.',
-            'framework': 'fastapi',
-            'framework_name': 'FastAPI (Async)',
-            'framework_type': style,
-            'form_html': form_html,
-        },
+        form_page_context(_ORGANIZATION_SHARED_PAGE_CONTEXT, request, style, form_html),
     )
 
 
@@ -1253,19 +1335,19 @@ async def organization_shared_post(
     model can power multiple framework routes and API endpoints.
     """
     form_data = await request.form()
-    form_dict = dict(form_data)
 
-    parsed_data = parse_nested_form_data(form_dict)
-    validation = CompanyOrganizationForm.validate(
+    parsed_data = parse_nested_form_data(form_data.multi_items())
+    validation = await asyncio.to_thread(
+        CompanyOrganizationForm.validate,
         parsed_data,
         submit_url=f'/organization-shared?style={style}',
         framework=style,
         debug=debug,
         show_timing=show_timing,
     )
-    full_referer_path = create_refer_path(request)
 
     if validation.is_valid:
+        full_referer_path = create_refer_path(request)
         return templates.TemplateResponse(
             request,
             'success.html',
@@ -1284,19 +1366,69 @@ async def organization_shared_post(
     return templates.TemplateResponse(
         request,
         'form.html',
-        {
-            'request': request,
-            'title': 'Organization (Shared Models) - 5 Levels Deep 🏢',
-            'description': 'Reusable organization-only example powered by models in shared_models.py.',
-            'framework': 'fastapi',
-            'framework_name': 'FastAPI (Async)',
-            'framework_type': style,
-            'form_html': form_html,
-            'errors': validation.errors,
-        },
+        form_page_context(
+            _ORGANIZATION_SHARED_PAGE_CONTEXT, request, style, form_html, validation.errors
+        ),
     )
 
 
+_LAYOUTS_DEMO_DATA = MappingProxyType(
+    {
+        'vertical_tab': {
+            'first_name': 'Alex',
+            'last_name': 'Johnson',
+            'email': 'alex.johnson@example.com',
+            'birth_date': '1990-05-15',
+        },
+        'horizontal_tab': {
+            'phone': '+1 (555) 987-6543',
+            'address': '456 Demo Street',
+            'city': 'San Francisco',
+            'postal_code': '94102',
+        },
+        'tabbed_tab': {
+            'notification_email': True,
+            'notification_sms': False,
+            'theme': 'dark',
+            'language': 'en',
+        },
+        'list_tab': {
+            'project_name': 'Demo Project',
+            'tasks': [
+                {
+                    'task_name': 'Complete project setup',
+                    'priority': 'high',
+                    'due_date': '2024-12-01',
+                },
+                {
+                    'task_name': 'Write documentation',
+                    'priority': 'medium',
+                    'due_date': '2024-12-15',
+                },
+            ],
+        },
+    }
+)
+
+
+_LAYOUTS_PAGE_CONTEXT = MappingProxyType(
+    {
+        'title': 'Layout Demonstration - All Types',
+        'description': 'Single form showcasing Vertical, Horizontal, Tabbed, and List layouts',
+        'framework': 'fastapi',
+        'framework_name': 'FastAPI (Async)',
+    }
+)
+_LAYOUTS_ERROR_PAGE_CONTEXT = MappingProxyType(
+    {
+        'title': 'Layout Demonstration - Validation Errors',
+        'description': 'Please fix the highlighted fields',
+        'framework': 'fastapi',
+        'framework_name': 'FastAPI (Async)',
+    }
+)
+
+
 @app.get('/layouts', response_class=HTMLResponse, tags=['Showcase'])
 async def layouts_get(
     request: Request,
@@ -1308,55 +1440,14 @@ async def layouts_get(
 ):
     """Comprehensive layout demonstration - single form showcasing all layout types."""
     # Parse optional pre-fill data or use demo data
-    form_data = {}
+    form_data = _EMPTY_FORM_DATA
     if data:
-        try:
-            import json
-
-            form_data = json.loads(data)
-        except Exception:
-            pass  # Ignore invalid JSON
+        form_data = parse_json_data_param(data)
     elif demo or not data:
         # Add demo data for easier testing of all layout types
-        form_data = {
-            'vertical_tab': {
-                'first_name': 'Alex',
-                'last_name': 'Johnson',
-                'email': 'alex.johnson@example.com',
-                'birth_date': '1990-05-15',
-            },
-            'horizontal_tab': {
-                'phone': '+1 (555) 987-6543',
-                'address': '456 Demo Street',
-                'city': 'San Francisco',
-                'postal_code': '94102',
-            },
-            'tabbed_tab': {
-                'notification_email': True,
-                'notification_sms': False,
-                'theme': 'dark',
-                'language': 'en',
-            },
-            'list_tab': {
-                'project_name': 'Demo Project',
-                'tasks': [
-                    {
-                        'task_name': 'Complete project setup',
-                        'priority': 'high',
-                        'due_date': '2024-12-01',
-                    },
-                    {
-                        'task_name': 'Write documentation',
-                        'priority': 'medium',
-                        'due_date': '2024-12-15',
-                    },
-                ],
-            },
-        }
+        form_data = _LAYOUTS_DEMO_DATA
 
-    from pydantic_schemaforms.html_markers import wrap_with_schemaforms_markers
-
-    renderer = EnhancedFormRenderer(framework=style)
+    renderer = enhanced_renderer(style)
     form_html = await renderer.render_form_from_model_async(
         LayoutDemonstrationForm,
         data=form_data,
@@ -1367,18 +1458,9 @@ async def layouts_get(
         show_timing=show_timing,
     )
     form_html = wrap_with_schemaforms_markers(form_html)
+
     return templates.TemplateResponse(
-        request,
-        'form.html',
-        {
-            'request': request,
-            'title': 'Layout Demonstration - All Types',
-            'description': 'Single form showcasing Vertical, Horizontal, Tabbed, and List layouts',
-            'framework': 'fastapi',
-            'framework_name': 'FastAPI (Async)',
-            'framework_type': style,
-            'form_html': form_html,
-        },
+        request, 'form.html', form_page_context(_LAYOUTS_PAGE_CONTEXT, request, style, form_html)
     )
 
 
@@ -1391,13 +1473,11 @@ async def layouts_post(
 ):
     """Handle comprehensive layout demonstration form submission."""
     form_data = await request.form()
-    form_dict = dict(form_data)
-    full_referer_path = create_refer_path(request)
-
-    parsed_data = parse_nested_form_data(form_dict)
-    validation = LayoutDemonstrationForm.validate(parsed_data)
+    parsed_data = parse_nested_form_data(form_data.multi_items())
+    validation = await asyncio.to_thread(LayoutDemonstrationForm.validate, parsed_data)
 
     if validation.is_valid:
+        full_referer_path = create_refer_path(request)
         return templates.TemplateResponse(
             request,
             'success.html',
@@ -1413,9 +1493,7 @@ async def layouts_post(
         )
 
     # Re-render the form with validation errors + user data.
-    from pydantic_schemaforms.html_markers import wrap_with_schemaforms_markers
-
-    renderer = EnhancedFormRenderer(framework=style)
+    renderer = enhanced_renderer(style)
     form_html = await renderer.render_form_from_model_async(
         LayoutDemonstrationForm,
         data=parsed_data,
@@ -1430,22 +1508,49 @@ async def layouts_post(
     return templates.TemplateResponse(
         request,
         'form.html',
-        {
-            'request': request,
-            'title': 'Layout Demonstration - Validation Errors',
-            'description': 'Please fix the highlighted fields',
-            'framework': 'fastapi',
-            'framework_name': 'FastAPI (Async)',
-            'framework_type': style,
-            'form_html': form_html,
-            'errors': validation.errors,
-        },
+        form_page_context(
+            _LAYOUTS_ERROR_PAGE_CONTEXT, request, style, form_html, validation.errors
+        ),
+    )
+
+
+_SELF_CONTAINED_DEMO_DATA = MappingProxyType(
+    {
+        'username': 'self_contained_user',
+        'email': 'selfcontained@example.com',
+        'password': 'DemoPass123!',
+        'confirm_password': 'DemoPass123!',
+        'full_name': 'Self Contained Demo',
+        'age': 25,
+        'agree_terms': True,
+        'newsletter': False,
+    }
+)
+
+
+_SELF_CONTAINED_STYLES = frozenset({'bootstrap', 'material', 'none'})
+
+
+def self_contained_style(style: str = 'material') -> str:
+    """Normalise the ``style`` query param, falling back to ``material``."""
+    selected_style = (style or 'material').lower()
+    return selected_style if selected_style in _SELF_CONTAINED_STYLES else 'material'
+
+
+_BOOL_QUERY = {True: 'true', False: 'false'}
+
+
+def self_contained_submit_url(selected_style: str, debug: bool, show_timing: bool) -> str:
+    """Post-back URL for the self-contained form, preserving the debug knobs."""
+    return (
+        f'/self-contained?style={selected_style}&demo=false'
+        f'&debug={_BOOL_QUERY[debug]}&show_timing={_BOOL_QUERY[show_timing]}'
     )
 
 
 @app.get('/self-contained', response_class=HTMLResponse, tags=['Self-Contained'])
 async def self_contained(
-    style: str = 'material',
+    selected_style: str = Depends(self_contained_style),
     demo: bool = True,
     debug: bool = True,
     show_timing: bool = True,
@@ -1458,31 +1563,14 @@ async def self_contained(
     - Posts back to `/self-contained` so submissions work without extra routes.
     - Honors `style` for `bootstrap`, `material`, and `none` (plain HTML).
     """
-    from pydantic_schemaforms.html_markers import wrap_with_schemaforms_markers
-
-    selected_style = (style or 'material').lower()
-    if selected_style not in {'bootstrap', 'material', 'none'}:
-        selected_style = 'material'
-
     # Add demo data if requested
-    form_data = {}
-    if demo:
-        form_data = {
-            'username': 'self_contained_user',
-            'email': 'selfcontained@example.com',
-            'password': 'DemoPass123!',
-            'confirm_password': 'DemoPass123!',
-            'full_name': 'Self Contained Demo',
-            'age': 25,
-            'agree_terms': True,
-            'newsletter': False,
-        }
+    form_data = _SELF_CONTAINED_DEMO_DATA if demo else _EMPTY_FORM_DATA
 
     form_html = await render_form_html_async(
         UserRegistrationForm,
         framework=selected_style,
         form_data=form_data,
-        submit_url=f'/self-contained?style={selected_style}&demo=false&debug={str(debug).lower()}&show_timing={str(show_timing).lower()}',
+        submit_url=self_contained_submit_url(selected_style, debug, show_timing),
         self_contained=True,
         debug=debug,
         show_timing=show_timing,
@@ -1495,7 +1583,7 @@ async def self_contained(
 @app.post('/self-contained', response_class=HTMLResponse, tags=['Self-Contained'])
 async def self_contained_post(
     request: Request,
-    style: str = 'material',
+    selected_style: str = Depends(self_contained_style),
     debug: bool = True,
     show_timing: bool = True,
 ):
@@ -1506,19 +1594,11 @@ async def self_contained_post(
     `UserRegistrationForm` and errors are rendered back into the same
     self-contained HTML output.
     """
-    from pydantic_schemaforms.html_markers import wrap_with_schemaforms_markers
-
-    selected_style = (style or 'material').lower()
-    if selected_style not in {'bootstrap', 'material', 'none'}:
-        selected_style = 'material'
-
     form_data = await request.form()
-    form_dict = dict(form_data)
-    parsed_data = parse_nested_form_data(form_dict)
-    _submit_url = f'/self-contained?style={selected_style}&demo=false&debug={str(debug).lower()}&show_timing={str(show_timing).lower()}'
+    parsed_data = parse_nested_form_data(form_data.multi_items())
     validation = UserRegistrationForm.validate(
         parsed_data,
-        submit_url=_submit_url,
+        submit_url=self_contained_submit_url(selected_style, debug, show_timing),
         framework=selected_style,
         self_contained=True,
         debug=debug,
@@ -1557,19 +1637,56 @@ async def self_contained_post(
 # - It makes it easy for readers to add a new form example in one edit.
 # - It guarantees schema/render/submit endpoints all expose the same form set.
 # - It demonstrates a clean API-first pattern for SchemaForms integrations.
-FORM_REGISTRY = {
-    'login': MinimalLoginForm,
-    'register': UserRegistrationForm,
-    'pets': PetRegistrationForm,
-    'showcase': CompleteShowcaseForm,
-    'layouts': LayoutDemonstrationForm,
-    'organization': CompanyOrganizationForm,
-    'organization-shared': CompanyOrganizationForm,
-}
+FORM_REGISTRY = MappingProxyType(
+    {
+        'login': MinimalLoginForm,
+        'register': UserRegistrationForm,
+        'pets': PetRegistrationForm,
+        'showcase': CompleteShowcaseForm,
+        'layouts': LayoutDemonstrationForm,
+        'organization': CompanyOrganizationForm,
+        'organization-shared': CompanyOrganizationForm,
+    }
+)
+
+
+def get_registered_form(form_type: str) -> type[FormModel]:
+    """Look up a form class in FORM_REGISTRY, raising 404 for unknown types."""
+    form_class = FORM_REGISTRY.get(form_type)
+    if form_class is None:
+        raise HTTPException(status_code=404, detail='Form type not found')
+    return form_class
+
+
+@cache
+def json_schema_for(model: type) -> dict:
+    """Return ``model.model_json_schema()``, computed once per model class.
+
+    Schemas are fixed once the models are imported, and walking the nested
+    showcase/organization models is the bulk of the schema endpoints' work.
+    """
+    return model.model_json_schema()
+
+
+@cache
+def form_schema_body(form_type: str, form_class: type) -> bytes:
+    """Encoded ``/api/forms/{form_type}/schema`` payload, built once per form type."""
+    payload = {
+        'form_type': form_type,
+        'schema': json_schema_for(form_class),
+        'framework': 'fastapi',
+    }
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+@cache
+def json_schema_body(model: type) -> bytes:
+    """Encoded JSON Schema for ``model``, built once per model class."""
+    return json.dumps(json_schema_for(model), ensure_ascii=False, separators=(',', ':')).encode()
 
 
 @app.get('/api/forms/{form_type}/schema', tags=['Generic Form API'])
-async def api_form_schema(form_type: str):
+async def api_form_schema(form_type: str) -> Response:
     """
     Return JSON Schema for a form model.
 
@@ -1577,17 +1694,12 @@ async def api_form_schema(form_type: str):
     definitions directly from Pydantic models.
     """
 
-    if form_type not in FORM_REGISTRY:
-        raise HTTPException(status_code=404, detail='Form type not found')
-
-    form_class = FORM_REGISTRY[form_type]
-    schema = form_class.model_json_schema()
-
-    return {'form_type': form_type, 'schema': schema, 'framework': 'fastapi'}
+    form_class = get_registered_form(form_type)
+    return Response(content=form_schema_body(form_type, form_class), media_type='application/json')
 
 
 @app.post('/api/forms/{form_type}/submit', tags=['Generic Form API'])
-async def api_submit_form(form_type: str, request: Request):
+async def api_submit_form(form_type: str, request: Request) -> dict[str, Any]:
     """
     Validate JSON form submissions against a selected Pydantic form model.
 
@@ -1595,10 +1707,7 @@ async def api_submit_form(form_type: str, request: Request):
     request payload -> model validation -> normalized data/errors response.
     """
 
-    if form_type not in FORM_REGISTRY:
-        raise HTTPException(status_code=404, detail='Form type not found')
-
-    form_class = FORM_REGISTRY[form_type]
+    form_class = get_registered_form(form_type)
 
     json_data = await request.json()
 
@@ -1615,7 +1724,7 @@ async def api_submit_form(form_type: str, request: Request):
 @app.get('/api/forms/{form_type}/render', tags=['Generic Form API'])
 async def api_render_form(
     form_type: str, style: str = 'bootstrap', debug: bool = False, show_timing: bool = True
-):
+) -> dict[str, Any]:
     """
     Render a form model as HTML and return the markup in JSON.
 
@@ -1623,10 +1732,7 @@ async def api_render_form(
     output through API calls.
     """
 
-    if form_type not in FORM_REGISTRY:
-        raise HTTPException(status_code=404, detail='Form type not found')
-
-    form_class = FORM_REGISTRY[form_type]
+    form_class = get_registered_form(form_type)
     form_html = await render_form_html_async(
         form_class,
         framework=style,
@@ -1648,6 +1754,15 @@ async def api_render_form(
 # all validation constraints and Field(examples=[...]) preserved.
 
 
+_CONTACT_DEMO_DATA = MappingProxyType(
+    {
+        'name': 'Alice Example',
+        'email': 'alice@example.com',
+        'message': 'Hello! I have a question about your library.',
+    }
+)
+
+
 @app.get('/contact', response_class=HTMLResponse, tags=['Dual-Use: Form + JSON API'])
 async def contact_get(
     request: Request,
@@ -1657,15 +1772,7 @@ async def contact_get(
     show_timing: bool = False,
 ):
     """Render the contact form (HTML)."""
-    form_data = (
-        {
-            'name': 'Alice Example',
-            'email': 'alice@example.com',
-            'message': 'Hello! I have a question about your library.',
-        }
-        if demo
-        else {}
-    )
+    form_data = _CONTACT_DEMO_DATA if demo else _EMPTY_FORM_DATA
     form_html = await ContactForm.render_form_async(
         submit_url=f'/contact?style={style}',
         framework=style,
@@ -1742,9 +1849,9 @@ async def api_contact(data: ContactSchema):
 
 
 @app.get('/api/contact/schema', tags=['Dual-Use: Form + JSON API'])
-async def api_contact_schema():
+async def api_contact_schema() -> Response:
     """Return the clean JSON Schema used by the /api/contact endpoint."""
-    return ContactSchema.model_json_schema()
+    return Response(content=json_schema_body(ContactSchema), media_type='application/json')
 
 
 # ================================
@@ -1752,6 +1859,15 @@ async def api_contact_schema():
 # ================================
 
 
+_FEEDBACK_DEMO_DATA = MappingProxyType(
+    {
+        'subject': 'Documentation',
+        'rating': 4,
+        'comment': 'Very clear examples — the dual-use pattern is especially handy!',
+    }
+)
+
+
 @app.get('/feedback', response_class=HTMLResponse, tags=['Dual-Use: Form + JSON API'])
 async def feedback_get(
     request: Request,
@@ -1761,15 +1877,7 @@ async def feedback_get(
     show_timing: bool = False,
 ):
     """Render the feedback form (HTML)."""
-    form_data = (
-        {
-            'subject': 'Documentation',
-            'rating': 4,
-            'comment': 'Very clear examples — the dual-use pattern is especially handy!',
-        }
-        if demo
-        else {}
-    )
+    form_data = _FEEDBACK_DEMO_DATA if demo else _EMPTY_FORM_DATA
     form_html = await FeedbackForm.render_form_async(
         submit_url=f'/feedback?style={style}',
         framework=style,
@@ -1845,9 +1953,9 @@ async def api_feedback(data: FeedbackSchema):
 
 
 @app.get('/api/feedback/schema', tags=['Dual-Use: Form + JSON API'])
-async def api_feedback_schema():
+async def api_feedback_schema() -> Response:
     """Return the clean JSON Schema used by the /api/feedback endpoint."""
-    return FeedbackSchema.model_json_schema()
+    return Response(content=json_schema_body(FeedbackSchema), media_type='application/json')
 
 
 # ================================
@@ -1934,23 +2042,39 @@ async def htmx_validate_field(field_name: str, request: Request):
 # ================================
 
 
+# The health payload never changes, so encode it once for load-balancer probes.
+_HEALTH_BODY = json.dumps(
+    {'status': 'healthy', 'framework': 'fastapi', 'version': _psf_version},
+    separators=(',', ':'),
+).encode()
+
+
 @app.get('/api/health', tags=['System'])
 async def health_check():
     """Health check endpoint."""
-    return {'status': 'healthy', 'framework': 'fastapi', 'version': _psf_version}
+    return Response(content=_HEALTH_BODY, media_type='application/json')
+
+
+@lru_cache(maxsize=1024)
+def referer_to_path(referer: str) -> str:
+    """Reduce a Referer URL to ``path?query`` (scheme, host and fragment dropped)."""
+    url = referer.partition('#')[0]
+    _, sep, rest = url.partition('://')
+    if sep:
+        # The path (or query) starts at the first '/' or '?' after the host.
+        starts = [i for i in (rest.find('/'), rest.find('?')) if i != -1]
+        url = rest[min(starts) :] if starts else ''
+    url = url.removesuffix('?')
+    if not url.startswith('/'):
+        url = f'/{url}'
+    return url
 
 
 def create_refer_path(request: Request) -> str:
     """Helper function to create referer path with query parameters."""
     referer = request.headers.get('referer', '')
     if referer:
-        from urllib.parse import urlparse
-
-        parsed_referer = urlparse(referer)
-        referer_path = parsed_referer.path
-        referer_query = parsed_referer.query
-        full_referer_path = f'{referer_path}?{referer_query}' if referer_query else referer_path
-        return full_referer_path
+        return referer_to_path(referer)
     return '/'
 
 
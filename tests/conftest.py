@@ -0,0 +1,13 @@
+from collections.abc import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+
+
+@pytest.fixture(scope="session")
+def client() -> Iterator[TestClient]:
+    # One client (and one app lifespan) for the whole session.
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,24 @@
+import pytest
+
+from src.main import accepts_gzip
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("gzip, deflate, br", True),
+        ("br;q=1.0, GZIP;q=0.5", True),
+        ("gzip;q=0", False),
+        ("gzip; q=0.000", False),
+        ("x-gzip", False),
+        ("deflate, br", False),
+        ("*", True),
+        ("*;q=0", False),
+        ("gzip;q=0, *", False),
+        ("*;q=0, gzip", True),
+        ("gzip;q=oops", False),
+        ("", False),
+    ],
+)
+def test_accepts_gzip(header: str, expected: bool):
+    assert accepts_gzip(header) is expected
@@ -0,0 +1,20 @@
+import pytest
+
+from src.analytics import extract_client_ip
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected"),
+    [
+        ({"x-forwarded-for": "203.0.113.7, 10.0.0.1, 10.0.0.2"}, "203.0.113.7"),
+        ({"x-forwarded-for": " 203.0.113.7 "}, "203.0.113.7"),
+        ({"x-forwarded-for": ", 10.0.0.1", "x-real-ip": "198.51.100.4"}, "198.51.100.4"),
+        ({"x-real-ip": " 198.51.100.4 "}, "198.51.100.4"),
+        # X-Real-IP is a single value; it is passed through as sent, commas and all.
+        ({"x-real-ip": "198.51.100.4,10.0.0.1"}, "198.51.100.4,10.0.0.1"),
+        ({"x-real-ip": "   "}, "127.0.0.1"),
+        ({}, "127.0.0.1"),
+    ],
+)
+def test_extract_client_ip(headers: dict[str, str], expected: str):
+    assert extract_client_ip(headers, fallback="127.0.0.1") == expected
@@ -1,10 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
 
-from src.main import app
-
-
-client = TestClient(app)
 
 DASHBOARD_RELATED_PATHS = [
     "/dashboard",
@@ -18,12 +14,12 @@ DASHBOARD_RELATED_PATHS = [
 
 
 @pytest.mark.parametrize("path", DASHBOARD_RELATED_PATHS)
-def test_dashboard_and_analytics_routes_not_exposed(path: str):
+def test_dashboard_and_analytics_routes_not_exposed(client: TestClient, path: str):
     """The synced v26.2.3 demo app currently does not expose dashboard/analytics routes."""
     resp = client.get(path)
     assert resp.status_code == 404
 
 
-def test_dashboard_and_analytics_post_routes_not_exposed():
+def test_dashboard_and_analytics_post_routes_not_exposed(client: TestClient):
     resp = client.post("/api/analytics/purge")
     assert resp.status_code == 404
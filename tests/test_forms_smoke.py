@@ -4,9 +4,7 @@ from typing import Any
 import pytest
 from fastapi.testclient import TestClient
 
-from src.main import FORM_REGISTRY, app
-
-client = TestClient(app)
+from src.main import FORM_REGISTRY
 
 
 def _resolve_ref(ref: str, root_schema: dict[str, Any]) -> dict[str, Any]:
@@ -22,95 +20,74 @@ def _resolve_ref(ref: str, root_schema: dict[str, Any]) -> dict[str, Any]:
 
 
 def _merge_dicts(base: dict[str, Any], other: dict[str, Any]) -> dict[str, Any]:
-    merged = dict(base)
-    for key, value in other.items():
-        if (
-            key in merged
-            and isinstance(merged[key], dict)
-            and isinstance(value, dict)
-            and key in {"properties"}
-        ):
-            merged[key] = _merge_dicts(merged[key], value)
-        else:
-            merged[key] = value
+    merged = {**base, **other}
+    # "properties" is the only key merged rather than replaced.
+    base_properties = base.get("properties")
+    other_properties = other.get("properties")
+    if isinstance(base_properties, dict) and isinstance(other_properties, dict):
+        merged["properties"] = {**base_properties, **other_properties}
     return merged
 
 
-def _string_for_schema(schema: dict[str, Any]) -> str:
-    if "const" in schema:
-        return str(schema["const"])
+# Simple character-class patterns (``^[A-Z]{n}$``, ``^[0-9]{n,m}$``, ...) -> the class's
+# fill character repeated to the minimum length.
+_CLASS_PATTERN = re.compile(r"\^\[(A-Z|A-Za-z|0-9)\]\{(\d+)(?:,\d+)?\}\$")
+_CLASS_FILL = {"A-Z": "A", "A-Za-z": "a", "0-9": "0"}
+# Common patterns answered by exact lookup before any regex runs.
+_LITERAL_PATTERNS = {r"^[A-Z]{2}$": "AA", r"^\d{5}$": "00000"}
 
-    if "enum" in schema and schema["enum"]:
-        return str(schema["enum"][0])
-
-    fmt = schema.get("format")
-    if fmt == "email":
-        return "test@example.com"
-    if fmt == "uri":
-        return "https://example.com"
-    if fmt == "uuid":
-        return "00000000-0000-0000-0000-000000000000"
-    if fmt == "date":
-        return "2020-01-01"
-    if fmt == "date-time":
-        return "2020-01-01T00:00:00Z"
-
-    pattern = schema.get("pattern")
-    if isinstance(pattern, str):
-        m = re.fullmatch(r"\^\[A-Z\]\{(\d+)\}\$", pattern)
-        if m:
-            return "A" * int(m.group(1))
-
-        m = re.fullmatch(r"\^\[A-Z\]\{(\d+),(\d+)\}\$", pattern)
-        if m:
-            return "A" * int(m.group(1))
-
-        m = re.fullmatch(r"\^\[A-Z\]\{(\d+)\}\$", pattern)
-        if m:
-            return "A" * int(m.group(1))
-
-        m = re.fullmatch(r"\^\[A-Za-z\]\{(\d+)\}\$", pattern)
-        if m:
-            return "a" * int(m.group(1))
-
-        m = re.fullmatch(r"\^\[0-9\]\{(\d+)\}\$", pattern)
-        if m:
-            return "0" * int(m.group(1))
-
-        m = re.fullmatch(r"\^\[0-9\]\{(\d+),(\d+)\}\$", pattern)
-        if m:
-            return "0" * int(m.group(1))
-
-        if pattern == r"^[A-Z]{2}$":
-            return "AA"
-        if pattern == r"^\d{5}$":
-            return "00000"
-
-    min_length = schema.get("minLength")
-    if isinstance(min_length, int) and min_length > 0:
-        return "a" * min_length
-
-    return "test"
+
+def _string_for_schema(schema: dict[str, Any]) -> str:
+    match schema:
+        case {"const": value} | {"enum": [value, *_]}:
+            return str(value)
+        case {"format": "email"}:
+            return "test@example.com"
+        case {"format": "uri"}:
+            return "https://example.com"
+        case {"format": "uuid"}:
+            return "00000000-0000-0000-0000-000000000000"
+        case {"format": "date"}:
+            return "2020-01-01"
+        case {"format": "date-time"}:
+            return "2020-01-01T00:00:00Z"
+        case {"pattern": str(pattern)} if pattern in _LITERAL_PATTERNS:
+            return _LITERAL_PATTERNS[pattern]
+        case {"pattern": str(pattern)} if m := _CLASS_PATTERN.fullmatch(pattern):
+            return _CLASS_FILL[m.group(1)] * int(m.group(2))
+        case {"minLength": int(min_length)} if min_length > 0:
+            return "a" * min_length
+        case _:
+            return "test"
 
 
 def _number_for_schema(schema: dict[str, Any]) -> int | float:
-    if "const" in schema:
-        value = schema["const"]
-        return int(value) if isinstance(value, int) else float(value)
+    match schema:
+        case {"const": value} | {"enum": [value, *_]}:
+            return int(value) if isinstance(value, int) else float(value)
+        case {"minimum": int() | float() as minimum}:
+            return minimum
+        case {"exclusiveMinimum": int() | float() as exclusive_minimum}:
+            return exclusive_minimum + 1
+        case _:
+            return 1
 
-    if "enum" in schema and schema["enum"]:
-        value = schema["enum"][0]
-        return int(value) if isinstance(value, int) else float(value)
 
-    minimum = schema.get("minimum")
-    if isinstance(minimum, (int, float)):
-        return minimum
+_LEAF_TYPES = frozenset({"string", "integer", "number", "boolean"})
+# Keys that make a schema more than a plain typed leaf.
+_NON_LEAF_KEYS = frozenset({"$ref", "allOf", "anyOf", "oneOf", "const", "enum", "properties"})
 
-    exclusive_minimum = schema.get("exclusiveMinimum")
-    if isinstance(exclusive_minimum, (int, float)):
-        return exclusive_minimum + 1
 
-    return 1
+def _leaf_value(schema_type: Any, schema: dict[str, Any]) -> Any:
+    if schema_type == "boolean":
+        return True
+
+    if schema_type in {"integer", "number"}:
+        value = _number_for_schema(schema)
+        return int(value) if schema_type == "integer" else float(value)
+
+    # Default to string for unknown / missing types.
+    return _string_for_schema(schema)
 
 
 def build_minimal_payload_from_schema(
@@ -128,13 +105,18 @@ def build_minimal_payload_from_schema(
 
     if "$ref" in schema:
         ref = schema["$ref"]
+        # seen_refs holds the refs on the current path only, so a definition reused
+        # by sibling fields is expanded each time and only true cycles stop here.
         if ref in seen_refs:
             return {}
         seen_refs.add(ref)
-        resolved = _resolve_ref(ref, root_schema)
-        return build_minimal_payload_from_schema(
-            resolved, root_schema=root_schema, depth=depth + 1, seen_refs=seen_refs
-        )
+        try:
+            resolved = _resolve_ref(ref, root_schema)
+            return build_minimal_payload_from_schema(
+                resolved, root_schema=root_schema, depth=depth + 1, seen_refs=seen_refs
+            )
+        finally:
+            seen_refs.discard(ref)
 
     if "allOf" in schema:
         merged: dict[str, Any] = {}
@@ -148,14 +130,19 @@ def build_minimal_payload_from_schema(
         if merged:
             return merged
 
-    if "anyOf" in schema and schema["anyOf"]:
-        return build_minimal_payload_from_schema(
-            schema["anyOf"][0], root_schema=root_schema, depth=depth + 1, seen_refs=seen_refs
-        )
-
-    if "oneOf" in schema and schema["oneOf"]:
+    choices = schema.get("anyOf") or schema.get("oneOf")
+    if choices:
+        choice = choices[0]
+        # Plain scalar branches (e.g. Optional[str] -> anyOf[string, null]) need no recursion.
+        choice_type = choice.get("type")
+        if (
+            isinstance(choice_type, str)
+            and choice_type in _LEAF_TYPES
+            and _NON_LEAF_KEYS.isdisjoint(choice)
+        ):
+            return _leaf_value(choice_type, choice)
         return build_minimal_payload_from_schema(
-            schema["oneOf"][0], root_schema=root_schema, depth=depth + 1, seen_refs=seen_refs
+            choice, root_schema=root_schema, depth=depth + 1, seen_refs=seen_refs
         )
 
     if "const" in schema:
@@ -181,7 +168,7 @@ def build_minimal_payload_from_schema(
 
         # If there are no required fields, we still want to produce *something* stable.
         if not result and properties:
-            first_key = sorted(properties.keys())[0]
+            first_key = min(properties)
             result[first_key] = build_minimal_payload_from_schema(
                 properties[first_key], root_schema=root_schema, depth=depth + 1, seen_refs=seen_refs
             )
@@ -200,15 +187,18 @@ def build_minimal_payload_from_schema(
             )
         ]
 
-    if schema_type == "boolean":
-        return True
+    return _leaf_value(schema_type, schema)
 
-    if schema_type in {"integer", "number"}:
-        value = _number_for_schema(schema)
-        return int(value) if schema_type == "integer" else float(value)
 
-    # Default to string for unknown / missing types.
-    return _string_for_schema(schema)
+# Per JSON Schema type, a value that is very unlikely to coerce.
+_INVALID_FOR_TYPE: dict[str, Any] = {
+    "string": {"not": "a string"},
+    "integer": "not-an-int",
+    "number": "not-a-number",
+    "boolean": "not-a-bool",
+    "array": "not-an-array",
+    "object": "not-an-object",
+}
 
 
 def make_invalid_payload(root_schema: dict[str, Any]) -> dict[str, Any] | None:
@@ -220,29 +210,17 @@ def make_invalid_payload(root_schema: dict[str, Any]) -> dict[str, Any] | None:
     field_name = required[0]
     field_schema = properties.get(field_name, {})
 
-    # Pick a value that is very unlikely to coerce.
     field_type = field_schema.get("type")
-    if field_type == "string":
-        return {field_name: {"not": "a string"}}
-    if field_type == "integer":
-        return {field_name: "not-an-int"}
-    if field_type == "number":
-        return {field_name: "not-a-number"}
-    if field_type == "boolean":
-        return {field_name: "not-a-bool"}
-    if field_type == "array":
-        return {field_name: "not-an-array"}
-    if field_type == "object":
-        return {field_name: "not-an-object"}
-
-    return {field_name: None}
+    # "type" may be a list (e.g. ["string", "null"]); only plain types have a sentinel.
+    invalid = _INVALID_FOR_TYPE.get(field_type) if isinstance(field_type, str) else None
+    return {field_name: invalid}
 
 
-FORM_TYPES = sorted(FORM_REGISTRY.keys())
+FORM_TYPES: tuple[str, ...] = tuple(sorted(FORM_REGISTRY))
 
 
 @pytest.mark.parametrize("form_type", FORM_TYPES)
-def test_forms_schema_render_and_validation_smoke(form_type: str):
+def test_forms_schema_render_and_validation_smoke(client: TestClient, form_type: str):
     schema_resp = client.get(f"/api/forms/{form_type}/schema")
     assert schema_resp.status_code == 200
 
@@ -301,7 +279,7 @@ def test_forms_schema_render_and_validation_smoke(form_type: str):
     assert valid_body["data"] is not None
 
 
-def test_dual_use_contact_api_smoke():
+def test_dual_use_contact_api_smoke(client: TestClient):
     schema_resp = client.get("/api/contact/schema")
     assert schema_resp.status_code == 200
     schema = schema_resp.json()
@@ -328,7 +306,7 @@ def test_dual_use_contact_api_smoke():
     assert valid_resp.json() == valid_payload
 
 
-def test_dual_use_feedback_api_smoke():
+def test_dual_use_feedback_api_smoke(client: TestClient):
     schema_resp = client.get("/api/feedback/schema")
     assert schema_resp.status_code == 200
     schema = schema_resp.json()
@@ -0,0 +1,20 @@
+import pytest
+
+from src.main import referer_to_path
+
+
+@pytest.mark.parametrize(
+    ("referer", "expected"),
+    [
+        ("http://localhost:5000/login?style=material&demo=true", "/login?style=material&demo=true"),
+        ("https://example.com/pets", "/pets"),
+        ("https://example.com/pets?", "/pets"),
+        ("https://example.com/layouts?style=none#section-2", "/layouts?style=none"),
+        ("https://example.com", "/"),
+        ("https://example.com/", "/"),
+        ("https://example.com?demo=true", "/?demo=true"),
+        ("/register?style=bootstrap", "/register?style=bootstrap"),
+    ],
+)
+def test_referer_to_path(referer: str, expected: str):
+    assert referer_to_path(referer) == expected